@@ -20,21 +20,49 @@ Usage:
 """
 
 import argparse
+import contextlib
 import csv
-import json
+import functools
 import os
+import re
+import shutil
 import sys
-import time
+from collections import deque
+from collections.abc import Iterator
 from pathlib import Path
 
+import orjson
 from apify_client import ApifyClient
 
 DATA_DIR = Path("data")
 
 PROFILE_ACTOR = "apify/instagram-profile-scraper"
 
-
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT")
+
+# How long each server-side wait blocks before we report the run's status
+STATUS_UPDATE_SECS = 30
+
+# Bio keywords for the local collaborators report (Queens / NYC)
+LOCAL_KEYWORDS = [
+    "queens", "nyc", "new york", "flushing", "jamaica", "astoria",
+    "jackson heights", "long island city", "lic", "woodside",
+    "elmhurst", "corona", "forest hills", "rego park", "bayside",
+    "fresh meadows", "whitestone", "sunnyside", "ridgewood",
+    "maspeth", "middle village", "kew gardens", "howard beach",
+    "ozone park", "south ozone", "richmond hill", "woodhaven",
+    "rockaways", "rockaway", "broad channel",
+    "qns", "district 25", "district 19", "cd25",
+]
+# Whole-word matches only, so "lic" doesn't hit "public" and "corona" doesn't hit "coronado"
+LOCAL_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(kw) for kw in LOCAL_KEYWORDS) + r")\b", re.IGNORECASE
+)
+
+
+@functools.cache
 def get_client() -> ApifyClient:
+    """Return the shared Apify client, so every command reuses one HTTP session."""
     token = os.environ.get("APIFY_TOKEN")
     if not token:
         print("Error: Set APIFY_TOKEN environment variable.")
@@ -43,21 +71,204 @@ def get_client() -> ApifyClient:
     return ApifyClient(token)
 
 
+def wait_for_run(client: ApifyClient, run_id: str, on_status=None) -> dict:
+    """Wait for an Apify run to reach a terminal status. Returns the final run info.
+
+    Uses the API's server-side long-poll, so this returns as soon as the run finishes.
+    on_status(status, status_msg) is called between waits; by default the status is printed in place.
+    """
+    run_client = client.run(run_id)
+    while True:
+        run_info = run_client.wait_for_finish(wait_secs=STATUS_UPDATE_SECS)
+        status = run_info["status"]
+        if status in TERMINAL_STATUSES:
+            return run_info
+        status_msg = run_info.get("statusMessage", "")
+        if on_status:
+            on_status(status, status_msg)
+        else:
+            print(f"  [{status}] {status_msg}", end="\r")
+
+
+def _is_json_array(f) -> bool:
+    """Check whether a binary file holds a JSON array rather than JSON Lines. Leaves f at the start."""
+    head = f.read(1024).lstrip()
+    f.seek(0)
+    return head.startswith(b"[")
+
+
+def iter_raw_profiles(path: Path) -> Iterator[dict]:
+    """Yield raw Apify items from a JSON Lines file, or a JSON array (older runs, Apify exports).
+
+    JSON Lines files are streamed a line at a time; JSON arrays have to be parsed whole.
+    A last line that doesn't decode (left by an interrupted append) is skipped with a warning.
+    """
+    with open(path, "rb") as f:
+        if _is_json_array(f):
+            yield from orjson.loads(f.read())
+            return
+        lines = (line for line in f if line.strip())
+        for line in lines:
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                if next(lines, None) is not None:
+                    raise
+                print(f"Warning: skipping truncated last line in {path}")
+                return
+            yield item
+
+
+def load_raw_profiles(path: Path) -> list[dict]:
+    """Load all raw Apify items from a JSON Lines file or JSON array."""
+    return list(iter_raw_profiles(path))
+
+
+def _temp_path(path: Path, suffix: str = ".tmp") -> Path:
+    """Name a temp file that sits next to path, e.g. data/x.json -> data/x.json.tmp."""
+    return path.with_name(path.name + suffix)
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path, mode: str = "wb", **open_kwargs):
+    """Open a temp file for writing that replaces path only once the block completes.
+
+    An interrupted write never leaves path truncated; the old file stays until the rename.
+    """
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, mode, **open_kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def save_raw_profiles(path: Path, items: list[dict]) -> None:
+    """Write raw Apify items as JSON Lines, one compact object per line."""
+    with atomic_write(path) as f:
+        for item in items:
+            f.write(orjson.dumps(item))
+            f.write(b"\n")
+
+
+def _convert_json_array(path: Path) -> None:
+    """Rewrite a JSON array raw file (from older runs) as JSON Lines so it can be appended to."""
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        is_array = _is_json_array(f)
+    if is_array:
+        save_raw_profiles(path, load_raw_profiles(path))
+
+
+def _repair_last_line(path: Path) -> None:
+    """Drop a partial last line left by an interrupted append, so the next append starts on a fresh line.
+
+    A complete last line that's only missing its newline gets the newline instead.
+    """
+    if not path.exists():
+        return
+    with open(path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        # Walk back from the end to the start of the last line
+        start = end
+        while start > 0:
+            step = min(64 * 1024, start)
+            f.seek(start - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                start = start - step + newline + 1
+                break
+            start -= step
+        if start == end:
+            return
+        f.seek(start)
+        tail = f.read()
+        if not tail.strip():
+            return
+        try:
+            orjson.loads(tail)
+        except orjson.JSONDecodeError:
+            print(f"Warning: dropping truncated last line in {path}")
+            f.truncate(start)
+        else:
+            f.write(b"\n")
+
+
+def _prepare_for_append(path: Path) -> None:
+    """Get a raw profiles file ready to have JSON Lines appended to it."""
+    _convert_json_array(path)
+    _repair_last_line(path)
+
+
+def append_raw_profiles(path: Path, items: list[dict]) -> None:
+    """Append raw Apify items to a JSON Lines file."""
+    _prepare_for_append(path)
+    with open(path, "ab") as f:
+        for item in items:
+            f.write(orjson.dumps(item))
+            f.write(b"\n")
+
+
+def append_dataset(client: ApifyClient, dataset_id: str, path: Path) -> int:
+    """Stream a dataset's items into a JSON Lines file. Returns the number of items appended.
+
+    The API serves the dataset as JSON Lines, so the bytes go to disk as-is without being parsed.
+    They're downloaded to a sidecar file and only appended once the download completes, so a
+    failed or interrupted download never leaves part of a batch in the raw file.
+    """
+    part_path = _temp_path(path, ".part")
+    count = 0
+    last_byte = b"\n"
+    try:
+        with client.dataset(dataset_id).stream_items(item_format="jsonl") as response, open(part_path, "wb") as part:
+            for chunk in response.iter_bytes():
+                if chunk:
+                    part.write(chunk)
+                    count += chunk.count(b"\n")
+                    last_byte = chunk[-1:]
+            if last_byte != b"\n":
+                part.write(b"\n")
+                count += 1
+
+        _prepare_for_append(path)
+        with open(part_path, "rb") as part, open(path, "ab") as f:
+            shutil.copyfileobj(part, f)
+    finally:
+        part_path.unlink(missing_ok=True)
+    return count
+
+
+def load_pending_runs(pending_file: Path) -> list[dict]:
+    """Load the runs recorded as in progress. Older files hold a single run instead of a list."""
+    with open(pending_file, "rb") as f:
+        pending = orjson.loads(f.read())
+    return pending.get("runs", [pending])
+
+
+def save_pending_runs(pending_file: Path, runs) -> None:
+    """Record the runs currently in progress so an interrupted scrape can recover them."""
+    with atomic_write(pending_file) as f:
+        f.write(orjson.dumps({"runs": list(runs)}))
+
+
 def load_usernames(target: str, usernames_file: str | None = None) -> list[str]:
     """Load usernames to scrape from a text file or the followers export."""
     if usernames_file:
         path = Path(usernames_file)
+        # dict.fromkeys drops repeats but keeps file order, so nobody is scraped twice
         with open(path) as f:
-            usernames = [line.strip().strip('"').strip(',').strip('"')
-                         for line in f if line.strip()]
+            usernames = list(dict.fromkeys(line.strip().strip('"').strip(',').strip('"')
+                                           for line in f if line.strip()))
         print(f"Loaded {len(usernames)} usernames from {path}")
         return usernames
 
     # Fall back to the followers export
     followers_file = DATA_DIR / f"{target}_followers_export.json"
     if followers_file.exists():
-        with open(followers_file) as f:
-            usernames = [e["handle"] for e in json.load(f)]
+        with open(followers_file, "rb") as f:
+            usernames = list(dict.fromkeys(e["handle"] for e in orjson.loads(f.read())))
         print(f"Loaded {len(usernames)} usernames from {followers_file}")
         return usernames
 
@@ -72,18 +283,21 @@ def load_already_scraped(target: str) -> set[str]:
     # 1. Check Apify raw JSON from prior runs
     raw_file = DATA_DIR / f"{target}_apify_profiles_raw.json"
     if raw_file.exists():
-        with open(raw_file) as f:
-            data = json.load(f)
-        apify_set = {entry["username"] for entry in data if entry.get("username")}
+        apify_set = {entry["username"] for entry in iter_raw_profiles(raw_file) if entry.get("username")}
         scraped.update(apify_set)
         print(f"  From Apify raw JSON: {len(apify_set)} profiles")
 
     # 2. Check existing profiles CSV (from export_scraper.py or prior Apify runs)
     csv_file = DATA_DIR / f"{target}_profiles_export.csv"
     if csv_file.exists():
+        # Only the handle column is needed, so skip building a dict per row
+        csv_set: set[str] = set()
         with open(csv_file, newline="") as f:
-            reader = csv.DictReader(f)
-            csv_set = {row["handle"] for row in reader if row.get("handle")}
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if "handle" in header:
+                col = header.index("handle")
+                csv_set = {row[col] for row in reader if len(row) > col and row[col]}
         scraped.update(csv_set)
         print(f"  From profiles CSV: {len(csv_set)} profiles")
 
@@ -107,39 +321,30 @@ def recover_run(client: ApifyClient, run_id: str, target: str) -> set[str]:
     run_info = client.run(run_id).get()
     status = run_info["status"]
 
-    if status == "RUNNING":
-        print(f"  Run is still going — waiting for it to finish...")
-        while status == "RUNNING":
-            time.sleep(5)
-            run_info = client.run(run_id).get()
-            status = run_info["status"]
-            status_msg = run_info.get("statusMessage", "")
-            print(f"  [{status}] {status_msg}", end="\r")
+    # Newly started runs report READY before RUNNING; wait on anything not yet finished
+    if status not in TERMINAL_STATUSES:
+        print(f"  Run is still going ({status}) — waiting for it to finish...")
+        run_info = wait_for_run(client, run_id)
         print()
 
-    if status not in ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"):
-        print(f"  Run status: {status} — cannot recover.")
-        return set()
-
     dataset_id = run_info["defaultDatasetId"]
-    items = list(client.dataset(dataset_id).iterate_items())
 
-    if not items:
-        print("  No results to recover.")
-        return set()
-
-    # Merge into existing raw file
-    existing: list[dict] = []
+    # Append profiles not already in the raw file
+    existing_usernames: set[str] = set()
     if raw_file.exists():
-        with open(raw_file) as f:
-            existing = json.load(f)
+        existing_usernames = {e["username"] for e in iter_raw_profiles(raw_file) if e.get("username")}
 
-    existing_usernames = {e["username"] for e in existing if e.get("username")}
-    new_items = [i for i in items if i.get("username") not in existing_usernames]
-    existing.extend(new_items)
+    # iterate_items() pages through the dataset, so a large run is never cut off at the
+    # API's per-request limit, and only the new items are kept
+    new_items = [
+        i for i in client.dataset(dataset_id).iterate_items()
+        if i.get("username") not in existing_usernames
+    ]
+    if not new_items:
+        print("  No new results to recover.")
+        return set()
 
-    with open(raw_file, "w") as f:
-        json.dump(existing, f, indent=2)
+    append_raw_profiles(raw_file, new_items)
 
     recovered = {i["username"] for i in new_items if i.get("username")}
     print(f"  Recovered {len(recovered)} new profiles from run {run_id}")
@@ -151,7 +356,11 @@ def cmd_scrape(args: argparse.Namespace) -> None:
     DATA_DIR.mkdir(exist_ok=True)
     target = args.target
     batch_size = args.batch_size
+    concurrency = max(1, args.concurrency)
     raw_file = DATA_DIR / f"{target}_apify_profiles_raw.json"
+    profiles_file = DATA_DIR / f"{target}_profiles_export.csv"
+    failed_file = DATA_DIR / f"{target}_failed_enrichments.txt"
+    pending_file = DATA_DIR / f"{target}_pending_run.json"
 
     client = get_client()
 
@@ -164,23 +373,15 @@ def cmd_scrape(args: argparse.Namespace) -> None:
 
     # Safety check: if no existing data was found, confirm with user before spending API credits
     if not already_scraped and remaining:
-        existing_files = [
-            f for f in [
-                raw_file,
-                DATA_DIR / f"{target}_profiles_export.csv",
-                DATA_DIR / f"{target}_failed_enrichments.txt",
-            ] if f.exists()
-        ]
         print()
         print("WARNING: No existing scraped data found for this target.")
         print(f"This will send {len(remaining)} usernames to Apify (costs API credits).")
         print()
         print("Expected data files (none found):")
-        print(f"  - {raw_file}")
-        print(f"  - data/{target}_profiles_export.csv")
-        print(f"  - data/{target}_failed_enrichments.txt")
+        for path in (raw_file, profiles_file, failed_file):
+            print(f"  - {path}")
         print()
-        print("If you have data from a previous run, place it in the data/ directory first.")
+        print(f"If you have data from a previous run, place it in the {DATA_DIR}/ directory first.")
         confirm = input("Proceed with scraping? [y/N] ").strip().lower()
         if confirm != "y":
             print("Aborted.")
@@ -189,93 +390,90 @@ def cmd_scrape(args: argparse.Namespace) -> None:
     if not remaining:
         print("All profiles already scraped!")
     else:
-        # Check for a pending run from a previous interrupted session
-        pending_file = DATA_DIR / f"{target}_pending_run.json"
+        # Check for pending runs from a previous interrupted session
         if pending_file.exists():
-            with open(pending_file) as f:
-                pending = json.load(f)
-            print(f"\nFound pending run from previous session: {pending['run_id']}")
-            print("Recovering results...")
-            recovered = recover_run(client, pending["run_id"], target)
-            if recovered:
-                remaining = [u for u in remaining if u not in recovered]
-                print(f"Recovered {len(recovered)} profiles. Remaining: {len(remaining)}")
-            pending_file.unlink()
+            pending_runs = load_pending_runs(pending_file)
+            print(f"\nFound {len(pending_runs)} pending run(s) from previous session")
+            while pending_runs:
+                pending = pending_runs[0]
+                print(f"Recovering results from run {pending['run_id']}...")
+                recovered = recover_run(client, pending["run_id"], target)
+                if recovered:
+                    remaining = [u for u in remaining if u not in recovered]
+                    print(f"Recovered {len(recovered)} profiles. Remaining: {len(remaining)}")
+
+                # Only forget a run once its results are in the raw file
+                pending_runs.pop(0)
+                if pending_runs:
+                    save_pending_runs(pending_file, pending_runs)
+                else:
+                    pending_file.unlink()
 
         if not remaining:
             print("All profiles now scraped after recovery!")
         else:
-            # Load existing raw results for appending
-            existing: list[dict] = []
-            if raw_file.exists():
-                with open(raw_file) as f:
-                    existing = json.load(f)
-
-            total_batches = (len(remaining) + batch_size - 1) // batch_size
-
-            for i in range(0, len(remaining), batch_size):
-                batch = remaining[i : i + batch_size]
-                batch_num = (i // batch_size) + 1
-                print(f"\n--- Batch {batch_num}/{total_batches} ({len(batch)} usernames) ---")
-
-                try:
-                    # Start the run (non-blocking) and save run ID for recovery
-                    run = client.actor(PROFILE_ACTOR).start(
-                        run_input={
-                            "usernames": batch,
-                        },
-                        memory_mbytes=4096,
-                    )
-                    run_id = run["id"]
-                    dataset_id = run["defaultDatasetId"]
-
-                    # Save run ID so we can recover if interrupted
-                    with open(pending_file, "w") as f:
-                        json.dump({"run_id": run_id, "dataset_id": dataset_id}, f)
-
-                    print(f"  Started run {run_id} — waiting for completion...")
-
-                    # Poll until done
-                    while True:
-                        run_info = client.run(run_id).get()
-                        status = run_info["status"]
-                        if status in ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"):
-                            break
-                        status_msg = run_info.get("statusMessage", "")
-                        print(f"  [{status}] {status_msg}", end="\r")
-                        time.sleep(5)
+            batches = [remaining[i : i + batch_size] for i in range(0, len(remaining), batch_size)]
+            total_batches = len(batches)
+
+            # Keep up to `concurrency` runs going on Apify and collect them in start order:
+            # while we wait on the oldest run, the newer ones keep scraping.
+            in_flight: deque[dict] = deque()
+            next_batch = 0
+            scraped_count = 0
+
+            try:
+                while next_batch < total_batches or in_flight:
+                    while next_batch < total_batches and len(in_flight) < concurrency:
+                        batch = batches[next_batch]
+                        next_batch += 1
+                        print(f"\n--- Batch {next_batch}/{total_batches} ({len(batch)} usernames) ---")
+
+                        # Start the run (non-blocking) and save run ID for recovery
+                        run = client.actor(PROFILE_ACTOR).start(
+                            run_input={
+                                "usernames": batch,
+                            },
+                            memory_mbytes=4096,
+                        )
+                        in_flight.append({
+                            "batch_num": next_batch,
+                            "run_id": run["id"],
+                            "dataset_id": run["defaultDatasetId"],
+                        })
+                        save_pending_runs(pending_file, in_flight)
+                        print(f"  Started run {run['id']}")
+
+                    job = in_flight[0]
+                    print(f"\n  Waiting for batch {job['batch_num']}/{total_batches} (run {job['run_id']})...")
+                    status = wait_for_run(client, job["run_id"])["status"]
                     print()
 
                     if status != "SUCCEEDED":
                         print(f"  Run finished with status: {status}")
                         print("  Trying to fetch partial results anyway...")
 
-                    items = list(client.dataset(dataset_id).iterate_items())
-                    existing.extend(items)
-
-                    print(f"  Got {len(items)} profiles (total: {len(existing)})")
+                    # Append each batch as it lands for resume support
+                    count = append_dataset(client, job["dataset_id"], raw_file)
+                    scraped_count += count
 
-                    # Save after each batch for resume support
-                    with open(raw_file, "w") as f:
-                        json.dump(existing, f, indent=2)
+                    print(f"  Got {count} profiles (this session: {scraped_count})")
 
-                    # Clear pending run
-                    if pending_file.exists():
+                    # Clear the finished run from the pending list
+                    in_flight.popleft()
+                    if in_flight:
+                        save_pending_runs(pending_file, in_flight)
+                    elif pending_file.exists():
                         pending_file.unlink()
 
-                except KeyboardInterrupt:
-                    print(f"\n\nInterrupted! Run {run_id} is still going on Apify.")
-                    print(f"Re-run the same command to recover results when it finishes.")
-                    # Save what we have so far
-                    if existing:
-                        with open(raw_file, "w") as f:
-                            json.dump(existing, f, indent=2)
-                    sys.exit(1)
+            except KeyboardInterrupt:
+                run_ids = ", ".join(job["run_id"] for job in in_flight)
+                print(f"\n\nInterrupted! Still going on Apify: {run_ids or 'no runs'}.")
+                print(f"Re-run the same command to recover results when they finish.")
+                sys.exit(1)
 
-                except Exception as e:
-                    print(f"  Batch {batch_num} failed: {e}")
-                    print("  Progress saved. Re-run to resume from where you left off.")
-                    break
+            except Exception as e:
+                print(f"  Batch failed: {e}")
+                print("  Progress saved. Re-run to resume from where you left off.")
 
     # Convert and analyze
     print("\n=== Converting to CSV ===")
@@ -285,23 +483,18 @@ def cmd_scrape(args: argparse.Namespace) -> None:
         convert_apify_to_csv(raw_file, target)
 
     print("\n=== Running analysis ===")
-    run_analysis(target)
+    run_analysis(target, args.parquet)
 
 
 def convert_apify_to_csv(input_path: Path, target: str) -> Path:
     """Convert Apify JSON to the profiles CSV format."""
-    with open(input_path) as f:
-        apify_data = json.load(f)
-
-    print(f"Loaded {len(apify_data)} profiles from {input_path}")
-
     # Load current followers from export for follow_date and unfollower detection
     followers_file = DATA_DIR / f"{target}_followers_export.json"
     handle_to_date: dict[str, str] = {}
     current_follower_handles: set[str] = set()
     if followers_file.exists():
-        with open(followers_file) as f:
-            for entry in json.load(f):
+        with open(followers_file, "rb") as f:
+            for entry in orjson.loads(f.read()):
                 handle_to_date[entry["handle"]] = entry.get("follow_date", "")
                 current_follower_handles.add(entry["handle"])
         print(f"Loaded {len(current_follower_handles)} current followers from export")
@@ -329,11 +522,13 @@ def convert_apify_to_csv(input_path: Path, target: str) -> Path:
                     existing_profiles[row["handle"]] = row
         print(f"Loaded {len(existing_profiles)} existing profiles from CSV")
 
-    # Convert new Apify data and merge (Apify data overwrites existing for same handle)
+    # Stream Apify data and merge (Apify data overwrites existing for same handle)
+    loaded = 0
     new_count = 0
     skipped = 0
 
-    for entry in apify_data:
+    for entry in iter_raw_profiles(input_path):
+        loaded += 1
         username = entry.get("username", "")
         if not username:
             skipped += 1
@@ -369,6 +564,8 @@ def convert_apify_to_csv(input_path: Path, target: str) -> Path:
             new_count += 1
         existing_profiles[username] = row
 
+    print(f"Loaded {loaded} profiles from {input_path}")
+
     # Update status for existing profiles not in Apify data
     unfollowed_count = 0
     for handle, row in existing_profiles.items():
@@ -381,12 +578,12 @@ def convert_apify_to_csv(input_path: Path, target: str) -> Path:
     if unfollowed_count:
         print(f"Detected {unfollowed_count} unfollowers since last export")
 
-    # Write merged profiles
-    with open(profiles_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in existing_profiles.values():
-            writer.writerow(row)
+    # Write merged profiles as plain lists in column order (rows from older CSVs may lack columns).
+    # Written atomically so an interrupted write can't truncate profiles merged from the previous CSV.
+    with atomic_write(profiles_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows([row.get(k, "") for k in fieldnames] for row in existing_profiles.values())
 
     print(f"Wrote {len(existing_profiles)} profiles to {profiles_file} ({new_count} new from Apify, skipped {skipped})")
     return profiles_file
@@ -400,10 +597,17 @@ def cmd_convert(args: argparse.Namespace) -> None:
     convert_apify_to_csv(input_path, target)
 
     print("\n=== Running analysis ===")
-    run_analysis(target)
+    run_analysis(target, args.parquet)
+
+
+def save_report(frame, output_dir: Path, name: str, parquet: bool = False) -> None:
+    """Write a report as CSV, plus a zstd-compressed Parquet copy if requested."""
+    frame.to_csv(output_dir / f"{name}.csv", index=False)
+    if parquet:
+        frame.to_parquet(output_dir / f"{name}.parquet", index=False, compression="zstd")
 
 
-def run_analysis(target: str) -> None:
+def run_analysis(target: str, parquet: bool = False) -> None:
     """Generate analysis reports from enriched profile data."""
     import pandas as pd
 
@@ -413,19 +617,26 @@ def run_analysis(target: str) -> None:
         print("No profiles file. Run 'scrape' first.")
         sys.exit(1)
 
-    df = pd.read_csv(profiles_file, dtype={"ig_user_id": str})
+    # Declare column types up front so flags and counts aren't inferred (or left as
+    # object columns when a value is missing). This stays on the C parser: the pyarrow
+    # engine infers ig_user_id as a number before applying dtype, turning ids into floats.
+    bool_cols = ["is_verified", "is_private", "is_business", "is_professional"]
+    dtypes = {"ig_user_id": str, "category": "category", **dict.fromkeys(bool_cols, "boolean")}
+    dtypes.update(dict.fromkeys(["follower_count", "following_count", "post_count"], "Int64"))
+    df = pd.read_csv(profiles_file, dtype=dtypes)
     print(f"Loaded {len(df)} enriched profiles\n")
 
     output_dir = DATA_DIR / f"{target}_reports"
     output_dir.mkdir(exist_ok=True)
 
+    # Sort once; every report below is a slice of this frame and keeps its order
+    df = df.sort_values("follower_count", ascending=False, kind="mergesort")
+
     # Split current followers from unfollowers
     if "status" in df.columns:
-        unfollowers = df[df["status"] == "unfollowed"].sort_values(
-            "follower_count", ascending=False
-        )
+        unfollowers = df[df["status"] == "unfollowed"]
         if len(unfollowers) > 0:
-            unfollowers.to_csv(output_dir / "unfollowers.csv", index=False)
+            save_report(unfollowers, output_dir, "unfollowers", parquet)
             print(f"Unfollowers: {len(unfollowers)}")
             cols = ["handle", "full_name", "follower_count", "follow_date"]
             print(unfollowers[cols].head(20).to_string(index=False))
@@ -439,24 +650,29 @@ def run_analysis(target: str) -> None:
     following_file = DATA_DIR / f"{target}_following_export.json"
     following_handles: set[str] = set()
     if following_file.exists():
-        with open(following_file) as f:
-            following_handles = {e["handle"] for e in json.load(f)}
-        df["is_mutual"] = df["handle"].isin(following_handles)
+        with open(following_file, "rb") as f:
+            following_handles = {e["handle"] for e in orjson.loads(f.read())}
+        mutual_mask = df["handle"].isin(following_handles)
+        df["is_mutual"] = mutual_mask
         print(f"Cross-referenced with {len(following_handles)} following")
     else:
         df["is_mutual"] = False
 
+    # Build every report's mask in one place, then slice the sorted frame with each
+    follower_count = df["follower_count"]
+    # Unknown flags and counts only count as False here; the columns keep them blank
+    noteworthy_mask = (df["is_verified"] | (follower_count >= 5000)).fillna(False)
+    local_mask = df["bio"].fillna("").str.contains(LOCAL_RE)
+    large_mask = (follower_count >= 25000).fillna(False)
+    biz_mask = (df["is_business"] | df["is_professional"]).fillna(False)
+
     # 1. All followers (full dump, sorted by follower count descending)
-    df.sort_values("follower_count", ascending=False).to_csv(
-        output_dir / "all_followers.csv", index=False
-    )
+    save_report(df, output_dir, "all_followers", parquet)
 
     # 2. Noteworthy accounts (verified OR 5k+ followers)
-    noteworthy = df[
-        (df["is_verified"] == True) | (df["follower_count"] >= 5000)
-    ].sort_values("follower_count", ascending=False)
+    noteworthy = df[noteworthy_mask]
 
-    noteworthy.to_csv(output_dir / "noteworthy_accounts.csv", index=False)
+    save_report(noteworthy, output_dir, "noteworthy_accounts", parquet)
     print(f"Noteworthy (verified or 5k+ followers): {len(noteworthy)}")
     if len(noteworthy) > 0:
         cols = ["handle", "ig_user_id", "full_name", "follower_count",
@@ -465,23 +681,9 @@ def run_analysis(target: str) -> None:
     print()
 
     # 3. Local collaborators (Queens / NYC keywords in bio)
-    local_keywords = [
-        "queens", "nyc", "new york", "flushing", "jamaica", "astoria",
-        "jackson heights", "long island city", "lic", "woodside",
-        "elmhurst", "corona", "forest hills", "rego park", "bayside",
-        "fresh meadows", "whitestone", "sunnyside", "ridgewood",
-        "maspeth", "middle village", "kew gardens", "howard beach",
-        "ozone park", "south ozone", "richmond hill", "woodhaven",
-        "rockaways", "rockaway", "far rockaway", "broad channel",
-        "queens ny", "qns", "district 25", "district 19", "cd25",
-    ]
-    bio_lower = df["bio"].fillna("").str.lower()
-    local_mask = bio_lower.apply(
-        lambda bio: any(kw in bio for kw in local_keywords)
-    )
-    local = df[local_mask].sort_values("follower_count", ascending=False)
+    local = df[local_mask]
 
-    local.to_csv(output_dir / "local_collaborators.csv", index=False)
+    save_report(local, output_dir, "local_collaborators", parquet)
     print(f"Local collaborators (Queens/NYC in bio): {len(local)}")
     if len(local) > 0:
         cols = ["handle", "ig_user_id", "full_name", "follower_count", "bio"]
@@ -489,10 +691,8 @@ def run_analysis(target: str) -> None:
     print()
 
     # 4. Large followings (25k+)
-    large = df[df["follower_count"] >= 25000].sort_values(
-        "follower_count", ascending=False
-    )
-    large.to_csv(output_dir / "large_followings.csv", index=False)
+    large = df[large_mask]
+    save_report(large, output_dir, "large_followings", parquet)
     print(f"Large followings (25k+): {len(large)}")
     if len(large) > 0:
         cols = ["handle", "ig_user_id", "full_name", "follower_count",
@@ -501,9 +701,8 @@ def run_analysis(target: str) -> None:
     print()
 
     # 5. Business / Professional accounts
-    biz_mask = (df["is_business"] == True) | (df["is_professional"] == True)
-    business = df[biz_mask].sort_values("follower_count", ascending=False)
-    business.to_csv(output_dir / "business_accounts.csv", index=False)
+    business = df[biz_mask]
+    save_report(business, output_dir, "business_accounts", parquet)
     print(f"Business/Professional accounts: {len(business)}")
     print()
 
@@ -520,23 +719,18 @@ def run_analysis(target: str) -> None:
             )
             growth["follow_date"] = growth["follow_date"].astype(str)
             growth["cumulative"] = growth["new_followers"].cumsum()
-            growth.to_csv(output_dir / "follower_growth.csv", index=False)
+            save_report(growth, output_dir, "follower_growth", parquet)
             print("Follower growth by month:")
             print(growth.tail(12).to_string(index=False))
             print()
 
     # 7. Mutual follows (only if following data exists)
     if following_handles:
-        mutuals = df[df["is_mutual"] == True].sort_values(
-            "follower_count", ascending=False
-        )
-        mutuals.to_csv(output_dir / "mutual_follows.csv", index=False)
-        not_following_back = df[df["is_mutual"] == False].sort_values(
-            "follower_count", ascending=False
-        )
-        not_following_back.to_csv(
-            output_dir / "not_following_back.csv", index=False
-        )
+        # Reuse the isin() mask rather than rescanning is_mutual for each half
+        mutuals = df[mutual_mask]
+        save_report(mutuals, output_dir, "mutual_follows", parquet)
+        not_following_back = df[~mutual_mask]
+        save_report(not_following_back, output_dir, "not_following_back", parquet)
         print(f"Mutual follows: {len(mutuals)}")
         print(f"Followers you don't follow back: {len(not_following_back)}")
         print()
@@ -551,7 +745,7 @@ def run_analysis(target: str) -> None:
     print(f"Median follower count: {df['follower_count'].median():.0f}")
     print(f"Mean follower count: {df['follower_count'].mean():.0f}")
     if following_handles:
-        print(f"Mutual follows: {df['is_mutual'].sum()}")
+        print(f"Mutual follows: {mutual_mask.sum()}")
     print(f"\nAll reports saved → {output_dir}/")
 
 
@@ -574,6 +768,10 @@ def main():
         "--batch-size", type=int, default=1000,
         help="Usernames per Apify run (default: 1000)",
     )
+    scrape_sp.add_argument(
+        "--concurrency", type=int, default=2,
+        help="Apify runs to keep going at once; each uses 4 GB of Apify memory (default: 2)",
+    )
 
     # convert (existing JSON → reports, no scraping)
     convert_sp = subparsers.add_parser(
@@ -595,10 +793,16 @@ def main():
     recover_sp.add_argument("--target", required=True, help="Target IG username")
     recover_sp.add_argument("--run-id", required=True, help="Apify run ID to recover")
 
+    for sp in (scrape_sp, convert_sp, analyze_sp, recover_sp):
+        sp.add_argument(
+            "--parquet", action="store_true",
+            help="Also write each report as Parquet (faster to reload than CSV)",
+        )
+
     args = parser.parse_args()
 
     def cmd_analyze(args):
-        run_analysis(args.target)
+        run_analysis(args.target, args.parquet)
 
     def cmd_recover(args):
         client = get_client()
@@ -608,7 +812,7 @@ def main():
             raw_file = DATA_DIR / f"{args.target}_apify_profiles_raw.json"
             convert_apify_to_csv(raw_file, args.target)
             print(f"\n=== Running analysis ===")
-            run_analysis(args.target)
+            run_analysis(args.target, args.parquet)
 
     {"scrape": cmd_scrape, "convert": cmd_convert, "analyze": cmd_analyze, "recover": cmd_recover}[args.command](args)
 
@@ -12,10 +12,9 @@ import io
 import os
 import sys
 import contextlib
-import json
-import time
 from pathlib import Path
 
+import orjson
 import pandas as pd
 import streamlit as st
 
@@ -36,6 +35,8 @@ from apify_to_report import (
     run_analysis,
     get_client,
     load_already_scraped,
+    append_dataset,
+    wait_for_run,
     PROFILE_ACTOR,
 )
 from post_engagers import (
@@ -71,32 +72,35 @@ def save_upload(uploaded_file):
 
 
 def parse_usernames_from_upload(uploaded_file) -> list[str]:
-    """Extract usernames from an uploaded file (.txt or .json)."""
-    content = uploaded_file.read().decode("utf-8")
+    """Extract usernames from an uploaded file (.txt or .json).
+
+    Repeats are dropped (keeping file order) so no username is sent to Apify twice.
+    """
+    content = uploaded_file.read()
     name = uploaded_file.name.lower()
 
     if name.endswith(".json"):
-        data = json.loads(content)
+        data = orjson.loads(content)
         # Handle the followers export format: [{"handle": "...", ...}, ...]
         if isinstance(data, list) and data and isinstance(data[0], dict):
             # Try common key names
             for key in ("handle", "username", "user", "name"):
                 if key in data[0]:
-                    return [entry[key] for entry in data if entry.get(key)]
+                    return list(dict.fromkeys(entry[key] for entry in data if entry.get(key)))
             st.error(f"JSON has keys {list(data[0].keys())} — expected 'handle' or 'username'.")
             st.stop()
         # Handle plain list of strings: ["user1", "user2"]
         if isinstance(data, list) and data and isinstance(data[0], str):
-            return [u.strip() for u in data if u.strip()]
+            return list(dict.fromkeys(u.strip() for u in data if u.strip()))
         st.error("Unrecognized JSON format. Expected a list of objects with 'handle'/'username', or a list of strings.")
         st.stop()
     else:
         # Plain text: one username per line
-        return [
+        return list(dict.fromkeys(
             line.strip().strip('"').strip(",").strip('"')
-            for line in content.splitlines()
+            for line in content.decode("utf-8").splitlines()
             if line.strip()
-        ]
+        ))
 
 
 def show_reports(reports_dir: Path, key_prefix: str):
@@ -225,8 +229,7 @@ if tool == "Profile Scraper":
         st.info(f"Loaded **{len(usernames)}** usernames from {uploaded_file.name}")
 
         # Check already scraped
-        _, _ = capture_prints(load_already_scraped, target)
-        already_scraped = load_already_scraped(target)
+        already_scraped, _ = capture_prints(load_already_scraped, target)
         remaining = [u for u in usernames if u not in already_scraped]
 
         st.write(
@@ -239,11 +242,6 @@ if tool == "Profile Scraper":
             st.success("All profiles already scraped!")
         else:
             raw_file = DATA_DIR / f"{target}_apify_profiles_raw.json"
-            existing: list[dict] = []
-            if raw_file.exists():
-                with open(raw_file) as f:
-                    existing = json.load(f)
-
             total_batches = (len(remaining) + BATCH_SIZE - 1) // BATCH_SIZE
             progress = st.progress(0, text="Starting...")
 
@@ -264,25 +262,17 @@ if tool == "Profile Scraper":
                     dataset_id = run["defaultDatasetId"]
 
                     with st.status(f"Batch {batch_num}/{total_batches}", expanded=True) as status:
-                        while True:
-                            run_info = client.run(run_id).get()
-                            run_status = run_info["status"]
-                            if run_status in ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"):
-                                break
-                            status_msg = run_info.get("statusMessage", "")
-                            st.write(f"[{run_status}] {status_msg}")
-                            time.sleep(5)
-
-                        items = list(client.dataset(dataset_id).iterate_items())
-                        existing.extend(items)
+                        wait_for_run(
+                            client, run_id,
+                            on_status=lambda run_status, status_msg: st.write(f"[{run_status}] {status_msg}"),
+                        )
+
+                        count = append_dataset(client, dataset_id, raw_file)
                         status.update(
-                            label=f"Batch {batch_num} — {len(items)} profiles",
+                            label=f"Batch {batch_num} — {count} profiles",
                             state="complete",
                         )
 
-                    with open(raw_file, "w") as f:
-                        json.dump(existing, f, indent=2)
-
                 except Exception as e:
                     st.error(f"Batch {batch_num} failed: {e}")
                     st.info("Progress saved. Re-run to resume.")
@@ -426,8 +416,8 @@ elif tool == "Analyze Existing Data":
                 st.error("No post engager data found. Use the Post Engagers tool to scrape first.")
             else:
                 for raw_file in engager_files:
-                    with open(raw_file) as f:
-                        raw_data = json.load(f)
+                    with open(raw_file, "rb") as f:
+                        raw_data = orjson.loads(f.read())
                     csv_path, output = capture_prints(build_engagers_csv, raw_data)
                     st.write(f"**{raw_file.stem}**")
                     with st.expander("Summary"):
@@ -17,21 +17,32 @@ Usage:
 
 import argparse
 import csv
-import json
+import functools
+import hashlib
 import os
 import sys
 import time
+from operator import itemgetter
 from pathlib import Path
 
+import orjson
 from apify_client import ApifyClient
 
+from apify_to_report import atomic_write
+
 DATA_DIR = Path("data")
 
 LIKERS_ACTOR = "patient_discovery/instagram-likes"
 COMMENTS_ACTOR = "apify/instagram-comment-scraper"
 
+# Actor results are cached by (actor, run input) so repeat scrapes of a post don't pay twice
+CACHE_DIR = DATA_DIR / ".cache"
+CACHE_TTL_SECS = 24 * 60 * 60
+
 
+@functools.cache
 def get_client() -> ApifyClient:
+    """Return the shared Apify client, so every command reuses one HTTP session."""
     token = os.environ.get("APIFY_TOKEN")
     if not token:
         print("Error: Set APIFY_TOKEN environment variable.")
@@ -50,57 +61,58 @@ def output_prefix(post_url: str) -> str:
     return f"post_{shortcode_from_url(post_url)}"
 
 
-def scrape_likers(client: ApifyClient, post_url: str) -> list[dict]:
-    """Fetch all likers for a post."""
-    shortcode = shortcode_from_url(post_url)
-    print(f"Fetching likers (shortcode: {shortcode})...")
+def start_actor(client: ApifyClient, actor_id: str, run_input: dict) -> dict:
+    """Start an actor run without waiting for it. Pass the returned job to finish_actor().
 
-    run = client.actor(LIKERS_ACTOR).start(
-        run_input={"postUrls": [post_url], "postCode": shortcode},
-        memory_mbytes=4096,
-    )
-    run_id = run["id"]
-    dataset_id = run["defaultDatasetId"]
-
-    print(f"  Started run {run_id} — waiting...")
-    while True:
-        run_info = client.run(run_id).get()
-        status = run_info["status"]
-        if status in ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"):
-            break
-        time.sleep(3)
-    print(f"  Run finished: {status}")
+    If a recent cached result exists for the same actor and input, no run is started.
+    """
+    key = hashlib.sha256(orjson.dumps([actor_id, run_input], option=orjson.OPT_SORT_KEYS)).hexdigest()
+    cache_file = CACHE_DIR / f"{key}.json"
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < CACHE_TTL_SECS:
+        with open(cache_file, "rb") as f:
+            items = orjson.loads(f.read())
+        print(f"  Using cached results from {cache_file}")
+        return {"cache_file": cache_file, "items": items}
 
-    items = list(client.dataset(dataset_id).iterate_items())
-    print(f"  Got {len(items)} likers")
-    return items
+    run = client.actor(actor_id).start(run_input=run_input, memory_mbytes=4096)
+    print(f"  Started run {run['id']}")
+    return {"cache_file": cache_file, "run": run}
 
 
-def scrape_commenters(client: ApifyClient, post_url: str) -> list[dict]:
-    """Fetch all commenters for a post."""
-    print(f"Fetching commenters...")
+def finish_actor(client: ApifyClient, job: dict) -> list[dict]:
+    """Wait for a run from start_actor() and return its dataset items."""
+    if "items" in job:
+        return job["items"]
 
-    run = client.actor(COMMENTS_ACTOR).start(
-        run_input={"directUrls": [post_url]},
-        memory_mbytes=4096,
-    )
-    run_id = run["id"]
-    dataset_id = run["defaultDatasetId"]
-
-    print(f"  Started run {run_id} — waiting...")
-    while True:
-        run_info = client.run(run_id).get()
-        status = run_info["status"]
-        if status in ("SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"):
-            break
-        time.sleep(3)
+    run_id = job["run"]["id"]
+    print(f"  Waiting for run {run_id}...")
+    status = client.run(run_id).wait_for_finish()["status"]
     print(f"  Run finished: {status}")
 
-    items = list(client.dataset(dataset_id).iterate_items())
-    print(f"  Got {len(items)} comments")
+    # iterate_items() pages through the dataset; a single list_items() call is capped by the API
+    items = list(client.dataset(job["run"]["defaultDatasetId"]).iterate_items())
+
+    # Only cache complete results so a failed run is retried next time
+    if status == "SUCCEEDED":
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with atomic_write(job["cache_file"]) as f:
+            f.write(orjson.dumps(items))
     return items
 
 
+def start_likers(client: ApifyClient, post_url: str) -> dict:
+    """Start fetching all likers for a post."""
+    shortcode = shortcode_from_url(post_url)
+    print(f"Fetching likers (shortcode: {shortcode})...")
+    return start_actor(client, LIKERS_ACTOR, {"postUrls": [post_url], "postCode": shortcode})
+
+
+def start_commenters(client: ApifyClient, post_url: str) -> dict:
+    """Start fetching all commenters for a post."""
+    print(f"Fetching commenters...")
+    return start_actor(client, COMMENTS_ACTOR, {"directUrls": [post_url]})
+
+
 def scrape_post(client: ApifyClient, post_url: str) -> dict:
     """Scrape likers and commenters for a single post, save raw data."""
     DATA_DIR.mkdir(exist_ok=True)
@@ -110,23 +122,32 @@ def scrape_post(client: ApifyClient, post_url: str) -> dict:
     # Load existing data to avoid re-scraping
     existing: dict = {}
     if raw_file.exists():
-        with open(raw_file) as f:
-            existing = json.load(f)
+        with open(raw_file, "rb") as f:
+            existing = orjson.loads(f.read())
         print(f"Found existing data: {len(existing.get('likers', []))} likers, {len(existing.get('commenters', []))} commenters")
 
-    # Scrape likers if not already done
+    # Start whichever scrapes are missing before waiting, so both actors run on Apify at once
+    likers_job = commenters_job = None
+
     if existing.get("likers"):
         print(f"Skipping likers (already have {len(existing['likers'])})")
         likers = existing["likers"]
     else:
-        likers = scrape_likers(client, post_url)
+        likers_job = start_likers(client, post_url)
 
-    # Scrape commenters if not already done
     if existing.get("commenters"):
         print(f"Skipping commenters (already have {len(existing['commenters'])})")
         commenters = existing["commenters"]
     else:
-        commenters = scrape_commenters(client, post_url)
+        commenters_job = start_commenters(client, post_url)
+
+    if likers_job:
+        likers = finish_actor(client, likers_job)
+        print(f"  Got {len(likers)} likers")
+
+    if commenters_job:
+        commenters = finish_actor(client, commenters_job)
+        print(f"  Got {len(commenters)} comments")
 
     # Save raw data
     raw_data = {
@@ -135,8 +156,8 @@ def scrape_post(client: ApifyClient, post_url: str) -> dict:
         "likers": likers,
         "commenters": commenters,
     }
-    with open(raw_file, "w") as f:
-        json.dump(raw_data, f, indent=2)
+    with atomic_write(raw_file) as f:
+        f.write(orjson.dumps(raw_data))
     print(f"\nRaw data saved to {raw_file}")
 
     return raw_data
@@ -199,16 +220,19 @@ def build_engagers_csv(raw_data: dict) -> Path:
     ]
 
     with open(csv_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in engagers.values():
-            writer.writerow(row)
-
-    # Print summary
-    likers_count = sum(1 for e in engagers.values() if e["liked"])
-    commenters_count = sum(1 for e in engagers.values() if e["commented"])
-    both_count = sum(1 for e in engagers.values() if e["liked"] and e["commented"])
-    comment_only = sum(1 for e in engagers.values() if e["commented"] and not e["liked"])
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(map(itemgetter(*fieldnames), engagers.values()))
+
+    # Print summary (tallied in one pass over the engagers)
+    likers_count = both_count = comment_only = 0
+    for e in engagers.values():
+        if e["liked"]:
+            likers_count += 1
+            both_count += e["commented"]
+        elif e["commented"]:
+            comment_only += 1
+    commenters_count = both_count + comment_only
 
     print(f"\n=== Engagers Summary ===")
     print(f"Total unique engagers: {len(engagers)}")
@@ -254,8 +278,8 @@ def cmd_analyze(args: argparse.Namespace) -> None:
         print(f"No raw data found at {raw_file}. Run 'scrape' first.")
         sys.exit(1)
 
-    with open(raw_file) as f:
-        raw_data = json.load(f)
+    with open(raw_file, "rb") as f:
+        raw_data = orjson.loads(f.read())
 
     build_engagers_csv(raw_data)
 